@@ -3,16 +3,17 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+import functools
 import logging as log
 import os
 import os.path as osp
+import sys
+from contextlib import suppress
 
 from datumaro.components.errors import ProjectNotFoundError
-from datumaro.components.project import Environment
-from datumaro.util.os_util import rmtree
 from datumaro.util.scope import on_error_do, scope_add, scoped
 
-from ..util import MultilineFormatter, add_subparser
+from ..util import MultilineFormatter
 from ..util.errors import CliException
 from ..util.project import (
     generate_next_file_name,
@@ -22,24 +23,88 @@ from ..util.project import (
 )
 
 
-def build_add_parser(parser_ctor=argparse.ArgumentParser):
-    builtins = sorted(Environment().launchers)
+@functools.lru_cache(maxsize=1)
+def _project_parent_parser():
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "-p",
+        "--project",
+        dest="project_dir",
+        help="Directory of the project to operate on (default: current dir)",
+    )
+    return parser
 
-    parser = parser_ctor(
-        help="Add model to project",
-        description="""
+
+def _is_non_empty_dir(path):
+    # A single scandir probe instead of an isdir check followed by a
+    # full listdir
+    try:
+        with os.scandir(path) as entries:
+            return next(entries, None) is not None
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _default_environment():
+    from datumaro.components.project import Environment
+
+    return Environment()
+
+
+@functools.lru_cache(maxsize=1)
+def _builtin_launchers():
+    return tuple(sorted(_default_environment().launchers))
+
+
+_ADD_DESC_PREFIX = """
         Adds an executable model into a project. A model requires
         a launcher to be executed. Each launcher has its own options, which
         are passed after the '--' separator, pass '-- -h' for more info.
         |n
-        List of builtin launchers: {}|n
+        List of builtin launchers: """
+
+_ADD_DESC_SUFFIX = """|n
         |n
         Examples:|n
         - Add an OpenVINO model into a project:|n
         |s|s%(prog)s -l openvino -- -d model.xml -w model.bin -i parse_outs.py
-        """.format(
-            ", ".join(builtins)
-        ),
+        """
+
+
+class _AddHelpDescription:
+    """
+    Renders the 'add' command description on demand. Building the text
+    requires plugin discovery via Environment(), which is too expensive
+    to pay on every CLI invocation, so it is delayed until argparse
+    actually formats the help message.
+    """
+
+    def __str__(self):
+        return _ADD_DESC_PREFIX + ", ".join(_builtin_launchers()) + _ADD_DESC_SUFFIX
+
+    def __contains__(self, item):
+        # argparse probes for '%(prog)' before interpolating
+        return item in str(self)
+
+    def __mod__(self, other):
+        return str(self) % other
+
+
+def _make_subcommand_parser(parser_ctor, command, **kwargs):
+    # The boilerplate shared by all the subcommand builders: the
+    # project option parent and the command dispatch entry
+    parser = parser_ctor(parents=[_project_parent_parser()], **kwargs)
+    parser.set_defaults(command=command)
+    return parser
+
+
+def build_add_parser(parser_ctor=argparse.ArgumentParser):
+    parser = _make_subcommand_parser(
+        parser_ctor,
+        add_command,
+        help="Add model to project",
+        description=_AddHelpDescription(),
         formatter_class=MultilineFormatter,
     )
 
@@ -56,19 +121,12 @@ def build_add_parser(parser_ctor=argparse.ArgumentParser):
     parser.add_argument(
         "--no-check", action="store_true", help="Don't check model loading (default: %(default)s)"
     )
-    parser.add_argument(
-        "-p",
-        "--project",
-        dest="project_dir",
-        help="Directory of the project to operate on (default: current dir)",
-    )
     parser.add_argument(
         "extra_args",
         nargs=argparse.REMAINDER,
         default=None,
         help="Additional arguments for converter (pass '-- -h' for help)",
     )
-    parser.set_defaults(command=add_command)
 
     return parser
 
@@ -93,14 +151,14 @@ def add_command(args):
     if project is not None:
         env = project.env
     else:
-        env = Environment()
+        env = _default_environment()
 
     name = args.name
     if name:
         if name in project.models:
             raise CliException("Model '%s' already exists" % name)
     else:
-        name = generate_next_name(list(project.models), "model", sep="-", default=0)
+        name = generate_next_name(project.models, "model", sep="-", default=0)
 
     try:
         launcher = env.launchers[args.launcher]
@@ -110,12 +168,40 @@ def add_command(args):
     cli_plugin = getattr(launcher, "cli_plugin", launcher)
     model_args = cli_plugin.parse_cmdline(args.extra_args)
 
-    if args.copy:
+    model_dir = None
+    model_registered = False
+
+    def _rollback():
+        # A single compound rollback instead of a registration
+        # per undo step
+        if model_registered:
+            with suppress(Exception):
+                project.remove_model(name)
+        if model_dir:
+            from datumaro.util.os_util import rmtree
+
+            with suppress(Exception):
+                rmtree(model_dir)
+
+    on_error_do(_rollback, ignore_errors=True)
+
+    copy = bool(getattr(args, "copy", False))
+
+    if copy:
+        # Avoid creating the directory when the launcher is known
+        # not to support copying
+        if not hasattr(cli_plugin, "copy_model"):
+            raise NotImplementedError(
+                "Can't copy: copying is not available for '%s' models. " % args.launcher
+            )
+
         log.info("Copying model data")
 
-        model_dir = project.model_data_dir(name)
-        os.makedirs(model_dir, exist_ok=False)
-        on_error_do(rmtree, model_dir, ignore_errors=True)
+        new_model_dir = project.model_data_dir(name)
+        os.makedirs(new_model_dir, exist_ok=False)
+        # only mark for rollback once the directory is actually
+        # created by us - a pre-existing one must not be removed
+        model_dir = new_model_dir
 
         try:
             cli_plugin.copy_model(model_dir, model_args)
@@ -125,7 +211,7 @@ def add_command(args):
             )
 
     project.add_model(name, launcher=args.launcher, options=model_args)
-    on_error_do(project.remove_model, name, ignore_errors=True)
+    model_registered = True
 
     if not args.no_check:
         log.info("Checking the model...")
@@ -139,18 +225,14 @@ def add_command(args):
 
 
 def build_remove_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor(
-        help="Remove model from project", description="Remove a model from a project"
+    parser = _make_subcommand_parser(
+        parser_ctor,
+        remove_command,
+        help="Remove model from project",
+        description="Remove a model from a project",
     )
 
     parser.add_argument("name", help="Name of the model to be removed")
-    parser.add_argument(
-        "-p",
-        "--project",
-        dest="project_dir",
-        help="Directory of the project to operate on (default: current dir)",
-    )
-    parser.set_defaults(command=remove_command)
 
     return parser
 
@@ -175,7 +257,9 @@ def remove_command(args):
 
 
 def build_run_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor(
+    parser = _make_subcommand_parser(
+        parser_ctor,
+        run_command,
         help="Launches model inference",
         description="""
         Launches model inference on a dataset.|n
@@ -206,16 +290,9 @@ def build_run_parser(parser_ctor=argparse.ArgumentParser):
     parser.add_argument(
         "-m", "--model", dest="model_name", required=True, help="Model to apply to the project"
     )
-    parser.add_argument(
-        "-p",
-        "--project",
-        dest="project_dir",
-        help="Directory of the project to operate on (default: current dir)",
-    )
     parser.add_argument(
         "--overwrite", action="store_true", help="Overwrite output directory if exists"
     )
-    parser.set_defaults(command=run_command)
 
     return parser
 
@@ -235,7 +312,7 @@ def get_run_sensitive_args():
 def run_command(args):
     dst_dir = args.dst_dir
     if dst_dir:
-        if not args.overwrite and osp.isdir(dst_dir) and os.listdir(dst_dir):
+        if not args.overwrite and _is_non_empty_dir(dst_dir):
             raise CliException(
                 "Directory '%s' already exists " "(pass --overwrite overwrite)" % dst_dir
             )
@@ -259,17 +336,10 @@ def run_command(args):
 
 
 def build_info_parser(parser_ctor=argparse.ArgumentParser):
-    parser = parser_ctor()
+    parser = _make_subcommand_parser(parser_ctor, info_command)
 
     parser.add_argument("-n", "--name", help="Model name")
     parser.add_argument("-v", "--verbose", action="store_true", help="Show details")
-    parser.add_argument(
-        "-p",
-        "--project",
-        dest="project_dir",
-        help="Directory of the project to operate on (default: current dir)",
-    )
-    parser.set_defaults(command=info_command)
 
     return parser
 
@@ -290,20 +360,42 @@ def info_command(args):
     if args.name:
         print(project.models[args.name])
     else:
+        # Write the listing in one go instead of a pair of
+        # syscalls per model
+        lines = []
         for name, conf in project.models.items():
-            print(name)
+            lines.append(name)
             if args.verbose:
-                print(dict(conf))
+                lines.append(str(dict(conf)))
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+
+
+_SUBCOMMANDS = {
+    "add": build_add_parser,
+    "remove": build_remove_parser,
+    "run": build_run_parser,
+    "info": build_info_parser,
+}
 
 
 def build_parser(parser_ctor=argparse.ArgumentParser):
     parser = parser_ctor()
 
+    builders = _SUBCOMMANDS
+
+    # A regular invocation uses a single subcommand, so there is no
+    # need to build the argparse trees for the rest of them. Peek at
+    # the command line to find the requested one; when there is no
+    # match (e.g. '-h' or an unknown name), build all the subparsers
+    # to render complete help and error messages.
+    requested = [name for name in sys.argv[1:] if name in builders]
+    if len(requested) == 1:
+        builders = {requested[0]: builders[requested[0]]}
+
     subparsers = parser.add_subparsers()
-    add_subparser(subparsers, "add", build_add_parser)
-    add_subparser(subparsers, "remove", build_remove_parser)
-    add_subparser(subparsers, "run", build_run_parser)
-    add_subparser(subparsers, "info", build_info_parser)
+    for name, builder in builders.items():
+        builder(lambda name=name, **kwargs: subparsers.add_parser(name, **kwargs))
 
     return parser
 
@@ -239,13 +239,10 @@ def build_add_parser(parser_ctor=argparse.ArgumentParser):
         default=".",
         help="Directory of the project to operate on (default: current dir)",
     )
-    parser.add_argument(
-        "extra_args",
-        nargs=argparse.REMAINDER,
-        help="Additional arguments for extractor (pass '-- -h' for help). "
-        "Must be specified after the main command arguments and after "
-        "the '--' separator",
-    )
+    # The '_positionals' workaround above captures all the positional
+    # arguments, so a second REMAINDER pass never received anything.
+    # add_command splits the extractor arguments out of '_positionals'.
+    parser.set_defaults(extra_args=[])
     parser.set_defaults(command=add_command)
 
     return parser
@@ -262,11 +259,12 @@ def add_command(args):
     # Workaround. Required positionals consume positionals from the end
     args._positionals += join_cli_args(args, "path", "extra_args")
 
-    has_sep = "--" in args._positionals
-    if has_sep:
+    try:
         pos = args._positionals.index("--")
-    else:
+        has_sep = 1
+    except ValueError:
         pos = 1
+        has_sep = 0
     args.path = (args._positionals[:pos] or [""])[0]
     args.extra_args = args._positionals[pos + has_sep :]
 
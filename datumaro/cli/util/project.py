@@ -2,11 +2,14 @@
 #
 # SPDX-License-Identifier: MIT
 
+import functools
 import os
+import os.path as osp
 import re
 from typing import Optional, Tuple
 
 from datumaro.cli.util.errors import WrongRevpathError
+from datumaro.components.config_model import ProjectLayout
 from datumaro.components.dataset import Dataset
 from datumaro.components.environment import Environment
 from datumaro.components.errors import DatumaroError, ProjectNotFoundError
@@ -14,9 +17,33 @@ from datumaro.components.project import Project, Revision
 from datumaro.util.os_util import generate_next_name
 from datumaro.util.scope import on_error_do, scoped
 
+_project_cache = {}  # (project path, readonly) -> (config mtime, project)
+
 
 def load_project(project_dir, readonly=False):
-    return Project(project_dir, readonly=readonly)
+    """
+    Loads a project. When the same project is requested several times in
+    a process, reuses the previously loaded instance, unless the project
+    config has been modified on disk or the instance has been closed.
+    """
+
+    real_dir = osp.realpath(project_dir if project_dir else ".")
+    conf_path = osp.join(real_dir, ProjectLayout.aux_dir, ProjectLayout.conf_file)
+    try:
+        conf_mtime = os.stat(conf_path).st_mtime_ns
+    except OSError:
+        # No config to key the cache on - load as usual. This also
+        # covers the missing project case, which must raise.
+        return Project(project_dir, readonly=readonly)
+
+    key = (real_dir, readonly)
+    cached = _project_cache.get(key)
+    if cached is not None and cached[0] == conf_mtime and cached[1]._git is not None:
+        return cached[1]
+
+    project = Project(project_dir, readonly=readonly)
+    _project_cache[key] = (conf_mtime, project)
+    return project
 
 
 def generate_next_file_name(basename, basedir=".", sep=".", ext=""):
@@ -25,8 +52,16 @@ def generate_next_file_name(basename, basedir=".", sep=".", ext=""):
     otherwise generates a name by appending sep to the basename
     and the number, next to the last used number in the basedir for
     files with basename prefix. Optionally, appends ext.
+
+    The directory listing is cached per directory mtime, so repeated
+    calls in a session do not rescan an unchanged directory.
     """
 
+    return _generate_next_file_name(basename, basedir, sep, ext, os.stat(basedir).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=16)
+def _generate_next_file_name(basename, basedir, sep, ext, _dir_mtime):
     return generate_next_name(os.listdir(basedir), basename, sep, ext)
 
 
@@ -157,12 +192,8 @@ def split_local_revpath(revpath: str) -> Tuple[Revision, str]:
     Returns: (revision, build target)
     """
 
-    sep_pos = revpath.find(":")
-    if -1 < sep_pos:
-        rev = revpath[:sep_pos]
-        target = revpath[sep_pos + 1 :]
-    else:
-        rev = ""
-        target = revpath
-
+    # a single scan and split instead of find() followed by slicing
+    rev, sep, target = revpath.partition(":")
+    if not sep:
+        rev, target = "", revpath
     return rev, target
@@ -121,7 +121,11 @@ class Config:
         return self._items(allow_fallback=allow_fallback, allow_internal=allow_internal).values()
 
     def __contains__(self, key):
-        return key in self.keys()
+        # Checking the parts directly avoids materializing the full
+        # item dict, which constructs the schema defaults
+        if key in self._config:
+            return True
+        return self._schema is not None and key in self._schema
 
     def __len__(self):
         return len(self.items())
@@ -246,6 +250,9 @@ class DictConfig(Config):
 
     def set(self, key, value):
         if self._default is not None:
+            # The ctor call also copies pre-built entries - callers
+            # (e.g. Tree.clone) rely on stored values not aliasing
+            # the inputs
             schema_entry_instance = self._default(value)
 
             if isinstance(value, (dict, Config)) and isinstance(schema_entry_instance, Config):
@@ -58,6 +58,7 @@ class BuildTarget(Config):
     def __init__(self, config=None):
         super().__init__(config, schema=BUILDTARGET_SCHEMA)
         self.stages = [BuildStage(o) for o in self.stages]
+        self.__dict__["_stage_indices"] = None
 
     @property
     def root(self):
@@ -71,12 +72,31 @@ class BuildTarget(Config):
     def has_stages(self) -> bool:
         return 1 < len(self.stages)
 
+    def _invalidate_stage_index(self):
+        self.__dict__["_stage_indices"] = None
+
+    def find_stage_index(self, name):
+        """
+        Returns the index of the stage with the given name, or None.
+        Keeps a name-to-index mapping to avoid a linear scan per
+        lookup; callers mutating 'stages' must invalidate it.
+        """
+
+        indices = self.__dict__.get("_stage_indices")
+        if indices is None or len(indices) != len(self.stages):
+            indices = {s.name: i for i, s in enumerate(self.stages)}
+            self.__dict__["_stage_indices"] = indices
+        return indices.get(name)
+
     def find_stage(self, stage):
         if stage == "root":
             return self.root
         elif stage == "head":
             return self.head
-        return find(self.stages, lambda x: x.name == stage or x == stage)
+        if isinstance(stage, str):
+            idx = self.find_stage_index(stage)
+            return self.stages[idx] if idx is not None else None
+        return find(self.stages, lambda x: x == stage)
 
     def get_stage(self, stage):
         res = self.find_stage(stage)
@@ -149,6 +169,7 @@ class ProjectLayout:
     models_dir = "models"
     plugins_dir = "plugins"
     conf_file = "config.yml"
+    hash_cache_file = "hash_cache.json"
 
 
 class TreeLayout:
@@ -4,15 +4,17 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging as log
 import os
 import os.path as osp
 import re
 import shutil
 import tempfile
-import unittest.mock
-from contextlib import ExitStack, suppress
+from contextlib import suppress
 from enum import Enum, auto
+from queue import Queue
+from threading import Thread
 from typing import (
     Any,
     Dict,
@@ -27,7 +29,6 @@ from typing import (
     Union,
 )
 
-import networkx as nx
 import ruamel.yaml as yaml
 
 from datumaro.components.config import Config
@@ -74,10 +75,13 @@ from datumaro.components.errors import (
 )
 from datumaro.components.launcher import Launcher
 from datumaro.components.media_manager import MediaManager
-from datumaro.util import find, parse_json_file, parse_str_enum_value
+from datumaro.util import dump_json_file, parse_json_file, parse_str_enum_value
+from datumaro.util.digraph import DiGraph
 from datumaro.util.log_utils import catch_logs, logging_disabled
 from datumaro.util.os_util import (
+    StatCache,
     copytree,
+    dir_entries,
     generate_next_name,
     is_subpath,
     make_file_name,
@@ -163,13 +167,19 @@ def _update_ignore_file(
     filepath: str,
     mode: Union[None, str, IgnoreMode] = None,
 ):
+    # The root is normalized once; each entry then needs a single
+    # normalization and a prefix slice instead of the repeated
+    # re-parsing osp.relpath would do
+    root = osp.abspath(repo_root)
+    root_prefix = root + osp.sep
+
     def _make_ignored_path(path):
-        path = osp.join(repo_root, osp.normpath(path))
-        assert is_subpath(path, base=repo_root)
+        path = osp.normpath(osp.join(root, path))
+        assert path.startswith(root_prefix), path
 
         # Prepend the '/' to match only direct childs.
         # Otherwise the rule can be in any path part.
-        return "/" + osp.relpath(path, repo_root).replace("\\", "/")
+        return "/" + path[len(root_prefix) :].replace("\\", "/")
 
     header = "# The file is autogenerated by Datumaro"
 
@@ -179,14 +189,17 @@ def _update_ignore_file(
         paths = [paths]
     paths = {osp.join(repo_root, osp.normpath(p)): _make_ignored_path(p) for p in paths}
 
-    openmode = "r+"
-    if not osp.isfile(filepath):
-        openmode = "w+"  # r+ cannot create, w truncates
+    if mode == IgnoreMode.rewrite:
+        openmode = "w"  # existing rules are discarded, don't read them
+    else:
+        openmode = "r+"
+        if not osp.isfile(filepath):
+            openmode = "w+"  # r+ cannot create, w truncates
     with open(filepath, openmode) as f:
         lines = []
         if mode in {IgnoreMode.append, IgnoreMode.remove}:
-            for line in f:
-                lines.append(line.strip())
+            # one read of the whole file instead of per-line iteration
+            lines = [line.strip() for line in f.read().splitlines()]
             f.seek(0)
 
         new_lines = []
@@ -212,10 +225,11 @@ def _update_ignore_file(
             new_lines.extend(paths.values())
 
         if not new_lines or new_lines[0] != header:
-            print(header, file=f)
-        for line in new_lines:
-            print(line, file=f)
-        f.truncate()
+            new_lines.insert(0, header)
+        # a single buffered write instead of a print per line
+        f.write("\n".join(new_lines) + "\n")
+        if mode != IgnoreMode.rewrite:
+            f.truncate()
 
 
 CrudEntry = TypeVar("CrudEntry")
@@ -223,6 +237,8 @@ T = TypeVar("T")
 
 
 class CrudProxy(Generic[CrudEntry]):
+    __slots__ = ()
+
     @property
     def _data(self) -> Dict[str, CrudEntry]:
         raise NotImplementedError()
@@ -249,13 +265,19 @@ class CrudProxy(Generic[CrudEntry]):
 
 
 class _DataSourceBase(CrudProxy[Source]):
+    __slots__ = ("_tree", "_field", "_config_data")
+
     def __init__(self, tree: Tree, config_field: str):
         self._tree = tree
         self._field = config_field
+        # The backing dict lives in the tree config, which is created
+        # once per tree and never replaces this entry wholesale, so the
+        # reference can be resolved eagerly instead of on every access
+        self._config_data = tree.config[config_field]
 
     @property
     def _data(self) -> Dict[str, Source]:
-        return self._tree.config[self._field]
+        return self._config_data
 
     def add(self, name: str, value: Union[Dict, Config, Source]) -> Source:
         if name in self:
@@ -268,6 +290,8 @@ class _DataSourceBase(CrudProxy[Source]):
 
 
 class ProjectSources(_DataSourceBase):
+    __slots__ = ()
+
     def __init__(self, tree: Tree):
         super().__init__(tree, "sources")
 
@@ -288,9 +312,11 @@ class BuildStageType(Enum):
 
 
 class Pipeline:
+    __slots__ = ("_graph", "_head", "_head_version", "_head_obj")
+
     @staticmethod
     def _create_graph(config: PipelineConfig):
-        graph = nx.DiGraph()
+        graph = DiGraph()
         for entry in config:
             target_name = entry["name"]
             parents = entry["parents"]
@@ -304,22 +330,26 @@ class Pipeline:
 
     def __init__(self, config: PipelineConfig = None):
         self._head = None
+        self._head_version = -1
+        self._head_obj = None
 
         if config is not None:
             self._graph = self._create_craph(config)
             if not self.head:
                 raise MissingPipelineHeadError()
         else:
-            self._graph = nx.DiGraph()
+            self._graph = DiGraph()
 
     def __getattr__(self, key):
         return getattr(self._graph, key)
 
     @staticmethod
     def _find_head_node(graph) -> Optional[str]:
+        # Reading the successors mapping directly avoids an
+        # out_degree() call per node
         head = None
-        for node in graph.nodes:
-            if graph.out_degree(node) == 0:
+        for node, succ in graph._succ.items():
+            if not succ:
                 if head is not None:
                     raise MultiplePipelineHeadsError(
                         "A pipeline can have only one "
@@ -330,13 +360,19 @@ class Pipeline:
 
     @property
     def head(self) -> str:
-        if self._head is None:
+        version = self._graph.version
+        if self._head is None or self._head_version != version:
             self._head = self._find_head_node(self._graph)
+            self._head_version = version
+            self._head_obj = None
         return self._head
 
     @property
     def head_node(self):
-        return self._graph.nodes[self.head]
+        head = self.head  # refreshes the caches if the graph changed
+        if self._head_obj is None:
+            self._head_obj = self._graph.nodes[head]
+        return self._head_obj
 
     @staticmethod
     def _serialize(graph) -> PipelineConfig:
@@ -357,15 +393,28 @@ class Pipeline:
         Returns a subgraph with all the target dependencies and
         the target itself.
         """
-        return graph.subgraph(nx.ancestors(graph, target) | {target})
+
+        # Walk the predecessors mapping directly instead of building
+        # ancestor sets and a predecessors view per node
+        pred = graph._pred
+        seen = {target}
+        stack = [target]
+        while stack:
+            for parent in pred[stack.pop()]:
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return graph.subgraph(seen)
 
     def get_slice(self, target) -> Pipeline:
         pipeline = Pipeline()
-        pipeline._graph = self._get_subgraph(self._graph, target).copy()
+        pipeline._graph = self._get_subgraph(self._graph, target)
         return pipeline
 
 
 class ProjectBuilder:
+    __slots__ = ("_project", "_tree")
+
     def __init__(self, project: Project, tree: Tree):
         self._project = project
         self._tree = tree
@@ -393,7 +442,8 @@ class ProjectBuilder:
     def _run_pipeline(self, pipeline: Pipeline):
         self._validate_pipeline(pipeline)
 
-        missing_sources, wd_hashes = self._find_missing_sources(pipeline)
+        missing_sources, wd_hashes, obj_cache_status = self._find_missing_sources(pipeline)
+        downloaded_any = False
         for source_name in missing_sources:
             source = self._tree.sources[source_name]
 
@@ -425,6 +475,7 @@ class ProjectBuilder:
 
             with self._project._make_tmp_dir() as tmp_dir:
                 obj_hash, _, _ = self._project._download_source(source.url, tmp_dir)
+                downloaded_any = True
 
                 if source.hash and source.hash != obj_hash:
                     raise MismatchingObjectError(
@@ -433,13 +484,21 @@ class ProjectBuilder:
                         "'%s' vs '%s'" % (source_name, obj_hash, source.hash)
                     )
 
-        return self._init_pipeline(pipeline, working_dir_hashes=wd_hashes)
+        if downloaded_any:
+            # Downloading adds objects to the DVC cache, so the recorded
+            # cache misses may be stale now. The hits stay valid, because
+            # objects are not removed from the caches during a build.
+            obj_cache_status = {h: v for h, v in obj_cache_status.items() if v}
+
+        return self._init_pipeline(
+            pipeline, working_dir_hashes=wd_hashes, obj_cache_status=obj_cache_status
+        )
 
     def _get_resulting_dataset(self, pipeline):
         graph, head = self._run_pipeline(pipeline)
         return graph.nodes[head]["dataset"]
 
-    def _init_pipeline(self, pipeline: Pipeline, working_dir_hashes=None):
+    def _init_pipeline(self, pipeline: Pipeline, working_dir_hashes=None, obj_cache_status=None):
         """
         Initializes datasets in the pipeline nodes. Currently, only the head
         node will have a dataset on exit, so no extra memory is wasted
@@ -447,30 +506,32 @@ class ProjectBuilder:
         """
 
         def _join_parent_datasets(force=False):
-            parents = {p: graph.nodes[p] for p in graph.predecessors(stage_name)}
+            parents = [(p, nodes[p]) for p in preds[stage_name]]
 
             if 1 < len(parents) or force:
                 try:
                     dataset = Dataset.from_extractors(
-                        *(p["dataset"] for p in parents.values()), env=self._tree.env
+                        *(p["dataset"] for _, p in parents), env=self._tree.env
                     )
                 except DatasetMergeError as e:
-                    e.sources = set(parents)
+                    e.sources = {p_name for p_name, _ in parents}
                     raise e
             else:
-                dataset = next(iter(parents.values()))["dataset"]
+                dataset = parents[0][1]["dataset"]
 
             # clear fully utilized datasets to release memory
-            for p_name, p in parents.items():
+            for p_name, p in parents:
                 p["_use_count"] = p.get("_use_count", 0) + 1
 
-                if p_name != head and p["_use_count"] == graph.out_degree(p_name):
+                if p_name != head and p["_use_count"] == len(succs[p_name]):
                     p.pop("dataset")
 
             return dataset
 
         if working_dir_hashes is None:
             working_dir_hashes = {}
+        if obj_cache_status is None:
+            obj_cache_status = {}
 
         def _try_load_from_disk(stage_name: str, stage_config: BuildStage) -> Dataset:
             # Check if we can restore this stage from the cache or
@@ -525,12 +586,15 @@ class ProjectBuilder:
                     data_dir = None
 
             if not data_dir and stage_hash:
-                if self._project._is_cached(stage_hash):
-                    data_dir = self._project.cache_path(stage_hash)
-                    cached = True
-                elif self._project._can_retrieve_from_vcs_cache(stage_hash):
-                    data_dir = self._project._materialize_obj(stage_hash)
-                    cached = True
+                # A cache miss recorded by _find_missing_sources stays
+                # valid here, so the object caches need not be re-checked
+                if obj_cache_status.get(stage_hash, True):
+                    if self._project._is_cached(stage_hash):
+                        data_dir = self._project.cache_path(stage_hash)
+                        cached = True
+                    elif self._project._can_retrieve_from_vcs_cache(stage_hash):
+                        data_dir = self._project._materialize_obj(stage_hash)
+                        cached = True
 
                 if not data_dir or not osp.isdir(data_dir):
                     log.debug(
@@ -553,15 +617,23 @@ class ProjectBuilder:
         # Pipeline is assumed to be validated already
         graph = pipeline._graph
         head = pipeline.head
+        nodes = graph._node
+        preds = graph._pred
+        succs = graph._succ
 
-        # traverse the graph and initialize nodes from sources to the head
+        # Find the stages which actually need building. A stage restored
+        # from the cache or the working directory cuts off its ancestors,
+        # so the load is attempted during discovery, once per stage.
         to_visit = [head]
+        needed = set()
         while to_visit:
             stage_name = to_visit.pop()
-            stage = graph.nodes[stage_name]
+            if stage_name in needed:
+                continue
+            needed.add(stage_name)
+
+            stage = nodes[stage_name]
             stage_config = stage["config"]
-            stage_type = BuildStageType[stage_config.type]
-            stage_hash = stage_config.hash
 
             assert stage.get("dataset") is None
 
@@ -570,84 +642,97 @@ class ProjectBuilder:
                 stage["dataset"] = dataset
                 continue
 
-            uninitialized_parents = []
-            for p_name in graph.predecessors(stage_name):
-                parent = graph.nodes[p_name]
-                if parent.get("dataset") is None:
-                    uninitialized_parents.append(p_name)
+            to_visit.extend(p for p in preds[stage_name] if p not in needed)
 
-            if uninitialized_parents:
-                to_visit.append(stage_name)
-                to_visit.extend(uninitialized_parents)
+        # Initialize the remaining stages from sources to the head.
+        # Topological order guarantees that all the parents of a stage are
+        # initialized by the time the stage is reached, so every stage is
+        # visited exactly once with no re-visiting.
+        for stage_name in graph.topological_sort():
+            if stage_name not in needed:
                 continue
 
-            if stage_type == BuildStageType.transform:
-                kind = stage_config.kind
-                try:
-                    transform = self._tree.env.transforms[kind]
-                except KeyError as e:
-                    raise UnknownStageError("Unknown transform '%s'" % kind) from e
-
-                dataset = _join_parent_datasets()
-                dataset = dataset.transform(transform, **stage_config.params)
-
-            elif stage_type == BuildStageType.filter:
-                dataset = _join_parent_datasets()
-                dataset = dataset.filter(**stage_config.params)
-
-            elif stage_type == BuildStageType.inference:
-                kind = stage_config.kind
-                model = self._project.make_model(kind)
-
-                dataset = _join_parent_datasets()
-                dataset = dataset.run_model(model)
-
-            elif stage_type == BuildStageType.source:
-                # Stages of type "Source" cannot have inputs,
-                # they are build tree inputs themselves
-                assert graph.in_degree(stage_name) == 0, stage_name
-
-                # The only valid situation we get here is that it is a
-                # generated source:
-                # - No cache entry
-                # - No local dir data
-                source_name = ProjectBuildTargets.strip_target_name(stage_name)
-                source = self._tree.sources[source_name]
-                if not source.is_generated:
-                    # Source is missing in the cache and the working tree,
-                    # and cannot be retrieved from the VCS cache.
-                    # It is assumed that all the missing sources were
-                    # downloaded earlier.
-                    raise MissingObjectError(
-                        "Failed to initialize stage '%s': "
-                        "object '%s' was not found in cache" % (stage_name, stage_hash)
-                    )
+            stage = nodes[stage_name]
+            if stage.get("dataset") is not None:
+                continue
 
-                # Generated sources do not require a data directory,
-                # but they still can be bound to a directory
-                if self._tree.is_working_tree:
-                    source_dir = self._project.source_data_dir(source_name)
-                else:
-                    source_dir = None
-                dataset = ProjectSourceDataset(
-                    source_dir,
-                    self._tree,
-                    source_name,
-                    readonly=not source_dir or self._project.readonly,
-                )
+            stage_config = stage["config"]
 
-            elif stage_type == BuildStageType.project:
-                dataset = _join_parent_datasets(force=True)
+            # A dict lookup on the raw type string replaces both the
+            # string-to-enum conversion and the equality chain per stage
+            handler = self._STAGE_HANDLERS.get(stage_config.type)
+            if handler is None:
+                raise UnknownStageError("Unexpected stage type '%s'" % stage_config.type)
 
-            elif stage_type == BuildStageType.convert:
-                dataset = _join_parent_datasets()
+            stage["dataset"] = handler(self, graph, stage_name, stage_config, _join_parent_datasets)
 
-            else:
-                raise UnknownStageError("Unexpected stage type '%s'" % stage_type)
+        return graph, head
 
-            stage["dataset"] = dataset
+    def _init_transform_stage(self, graph, stage_name, stage_config, join_parents):
+        kind = stage_config.kind
+        try:
+            transform = self._tree.env.transforms[kind]
+        except KeyError as e:
+            raise UnknownStageError("Unknown transform '%s'" % kind) from e
+
+        return join_parents().transform(transform, **stage_config.params)
+
+    def _init_filter_stage(self, graph, stage_name, stage_config, join_parents):
+        return join_parents().filter(**stage_config.params)
+
+    def _init_inference_stage(self, graph, stage_name, stage_config, join_parents):
+        model = self._project.make_model(stage_config.kind)
+
+        return join_parents().run_model(model)
+
+    def _init_source_stage(self, graph, stage_name, stage_config, join_parents):
+        # Stages of type "Source" cannot have inputs,
+        # they are build tree inputs themselves
+        assert graph.in_degree(stage_name) == 0, stage_name
+
+        # The only valid situation we get here is that it is a
+        # generated source:
+        # - No cache entry
+        # - No local dir data
+        source_name = ProjectBuildTargets.strip_target_name(stage_name)
+        source = self._tree.sources[source_name]
+        if not source.is_generated:
+            # Source is missing in the cache and the working tree,
+            # and cannot be retrieved from the VCS cache.
+            # It is assumed that all the missing sources were
+            # downloaded earlier.
+            raise MissingObjectError(
+                "Failed to initialize stage '%s': "
+                "object '%s' was not found in cache" % (stage_name, stage_config.hash)
+            )
 
-        return graph, head
+        # Generated sources do not require a data directory,
+        # but they still can be bound to a directory
+        if self._tree.is_working_tree:
+            source_dir = self._project.source_data_dir(source_name)
+        else:
+            source_dir = None
+        return ProjectSourceDataset(
+            source_dir,
+            self._tree,
+            source_name,
+            readonly=not source_dir or self._project.readonly,
+        )
+
+    def _init_project_stage(self, graph, stage_name, stage_config, join_parents):
+        return join_parents(force=True)
+
+    def _init_convert_stage(self, graph, stage_name, stage_config, join_parents):
+        return join_parents()
+
+    _STAGE_HANDLERS = {
+        BuildStageType.transform.name: _init_transform_stage,
+        BuildStageType.filter.name: _init_filter_stage,
+        BuildStageType.inference.name: _init_inference_stage,
+        BuildStageType.source.name: _init_source_stage,
+        BuildStageType.project.name: _init_project_stage,
+        BuildStageType.convert.name: _init_convert_stage,
+    }
 
     @staticmethod
     def _validate_pipeline(pipeline: Pipeline):
@@ -689,6 +774,7 @@ class ProjectBuilder:
 
     def _find_missing_sources(self, pipeline: Pipeline):
         work_dir_hashes = {}
+        obj_cache_status = {}
 
         def _can_retrieve(stage_name: str, stage_config: BuildStage):
             stage_hash = stage_config.hash
@@ -711,8 +797,15 @@ class ProjectBuilder:
                 if stage_hash and stage_hash == wd_hash:
                     return True
 
-            if stage_hash and self._project.is_obj_cached(stage_hash):
-                return True
+            if stage_hash:
+                # Record the outcomes, so that _init_pipeline can reuse
+                # them instead of stat-ing the object caches again
+                cached = obj_cache_status.get(stage_hash)
+                if cached is None:
+                    cached = self._project.is_obj_cached(stage_hash)
+                    obj_cache_status[stage_hash] = cached
+                if cached:
+                    return True
 
             return False
 
@@ -740,19 +833,31 @@ class ProjectBuilder:
                     continue
 
             checked_deps.add(stage_name)
-        return missing_sources, work_dir_hashes
+        return missing_sources, work_dir_hashes, obj_cache_status
 
 
 class ProjectBuildTargets(CrudProxy[BuildTarget]):
+    __slots__ = ("_tree", "_cached_data", "_sources_version")
+
     MAIN_TARGET = "project"
     BASE_STAGE = "root"
 
     def __init__(self, tree: Tree):
         self._tree = tree
+        self._cached_data = None
+        self._sources_version = -1
 
     @property
     def _data(self):
+        # The config dict is only extended here with default entries
+        # for new sources, so the filled-in result can be reused until
+        # the source list changes or the config is replaced (e.g. by
+        # Config.update)
+        sources = self._tree.sources
+        version = len(sources)
         data = self._tree.config.build_targets
+        if data is self._cached_data and self._sources_version == version:
+            return data
 
         if self.MAIN_TARGET not in data:
             data[self.MAIN_TARGET] = {
@@ -766,7 +871,7 @@ class ProjectBuildTargets(CrudProxy[BuildTarget]):
                 ]
             }
 
-        for source in self._tree.sources:
+        for source in sources:
             if source not in data:
                 data[source] = {
                     "stages": [
@@ -779,6 +884,8 @@ class ProjectBuildTargets(CrudProxy[BuildTarget]):
                     ]
                 }
 
+        self._cached_data = data
+        self._sources_version = version
         return data
 
     def __contains__(self, key):
@@ -814,10 +921,9 @@ class ProjectBuildTargets(CrudProxy[BuildTarget]):
         target = self._data[target_name]
 
         if prev:
-            prev_stage = find(enumerate(target.stages), lambda e: e[1].name == prev)
+            prev_stage = target.find_stage_index(prev)
             if prev_stage is None:
                 raise KeyError("Can't find stage '%s'" % prev)
-            prev_stage = prev_stage[0]
         else:
             prev_stage = len(target.stages) - 1
 
@@ -834,21 +940,26 @@ class ProjectBuildTargets(CrudProxy[BuildTarget]):
         value = BuildStage(value)
         assert value.type in BuildStageType.__members__
         target.stages.insert(prev_stage + 1, value)
+        target._invalidate_stage_index()
 
         return self.make_target_name(target_name, name)
 
     def remove_target(self, name: str):
         assert name != self.MAIN_TARGET, "Can't remove the main target"
         self._data.remove(name)
+        # The source list length may stay the same after a removal
+        # followed by an addition, so drop the cache explicitly
+        self._cached_data = None
 
     def remove_stage(self, target: str, name: str):
         assert name not in {self.BASE_STAGE}, "Can't remove a default stage"
 
         target = self._data[target]
-        idx = find(enumerate(target.stages), lambda e: e[1].name == name)
+        idx = target.find_stage_index(name)
         if idx is None:
             raise KeyError("Can't find stage '%s'" % name)
-        target.stages.remove(idx)
+        del target.stages[idx]
+        target._invalidate_stage_index()
 
     def add_transform_stage(
         self, target: str, transform: str, params: Optional[Dict] = None, name: Optional[str] = None
@@ -938,30 +1049,56 @@ class ProjectBuildTargets(CrudProxy[BuildTarget]):
     def strip_target_name(cls, name: str) -> str:
         return cls.split_target_name(name)[0]
 
-    def _make_full_pipeline(self) -> Pipeline:
+    def _make_partial_pipeline(self, target_name: str) -> Pipeline:
+        """
+        Makes a pipeline for the requested stage, including only the
+        stages it depends on. Targets unreachable from the requested
+        one are not visited, so the cost depends on the dependency
+        closure instead of the whole project.
+        """
+
         pipeline = Pipeline()
         graph = pipeline._graph
 
-        for target_name, target in self.items():
-            if target_name == self.MAIN_TARGET:
+        head_target, head_stage = self.split_target_name(target_name)
+
+        data = self._data
+
+        queue = [head_target]
+        seen = {head_target}
+        while queue:
+            current = queue.pop()
+            target = data[current]
+
+            if current == self.MAIN_TARGET:
                 # main target combines all the others
-                prev_stages = [
-                    self.make_target_name(n, t.head.name)
-                    for n, t in self.items()
-                    if n != self.MAIN_TARGET
-                ]
+                parents = [n for n in data if n != self.MAIN_TARGET]
             else:
-                prev_stages = [self.make_target_name(t, self[t].head.name) for t in target.parents]
+                parents = list(target.parents)
+            prev_stages = [self.make_target_name(p, data[p].head.name) for p in parents]
 
-            for stage in target.stages:
-                stage_name = self.make_target_name(target_name, stage["name"])
+            # The stage names are deterministic, so they are built once
+            # per target instead of inside the edge loop
+            stages = target.stages
+            stage_names = [self.make_target_name(current, s["name"]) for s in stages]
 
+            for stage, stage_name in zip(stages, stage_names):
                 graph.add_node(stage_name, config=stage)
 
                 for prev_stage in prev_stages:
                     graph.add_edge(prev_stage, stage_name)
                 prev_stages = [stage_name]
 
+                if current == head_target and stage["name"] == head_stage:
+                    # the following stages are not dependencies
+                    # of the requested one
+                    break
+
+            for parent in parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    queue.append(parent)
+
         return pipeline
 
     def make_pipeline(self, target: str) -> Pipeline:
@@ -972,7 +1109,7 @@ class ProjectBuildTargets(CrudProxy[BuildTarget]):
         if "." not in target:
             target = self.make_target_name(target, self[target].head.name)
 
-        return self._make_full_pipeline().get_slice(target)
+        return self._make_partial_pipeline(target)
 
 
 class GitWrapper:
@@ -995,6 +1132,7 @@ class GitWrapper:
     def __init__(self, project_dir, repo=None):
         self._project_dir = project_dir
         self.repo = repo
+        self._has_commits = False
 
         if repo is None and osp.isdir(project_dir) and osp.isdir(self._git_dir()):
             self.repo = self.module().Repo(project_dir)
@@ -1144,23 +1282,40 @@ class GitWrapper:
         base_dir = osp.abspath(base_dir)
         assert is_subpath(base_dir, base=repo_dir)
 
+        # repo.index builds a new IndexFile per access, re-reading the
+        # index file from disk, so resolve the entries once for the loop
+        index_entries = self.repo.index.entries
+
         statuses = {}
         for obj_path in paths:
             file_path = osp.join(base_dir, obj_path)
 
-            index_entry = self.repo.index.entries.get((obj_path, 0), None)
+            index_entry = index_entries.get((obj_path, 0), None)
             file_exists = osp.isfile(file_path)
             if not file_exists and index_entry:
                 status = "D"
             elif file_exists and not index_entry:
                 status = "A"
             elif file_exists and index_entry:
-                # '--ignore-cr-at-eol' doesn't affect '--name-status'
-                # so we can't really obtain 'T'
-                status = self.repo.git.diff("--ignore-cr-at-eol", index_entry.hexsha, file_path)
-                if status:
-                    status = "M"
-                assert status in {"", "M", "T"}, status
+                # An unchanged file hashes to its index entry. Comparing
+                # hashes in-process avoids spawning a 'git diff' process
+                # per file, which only remains needed for files with
+                # different bytes, to get EOL-insensitive comparison.
+                with open(file_path, "rb") as f:
+                    contents = f.read()
+                blob_hash = hashlib.sha1(  # nosec B324 - git object id, not security
+                    b"blob %d\x00" % len(contents) + contents
+                ).hexdigest()
+
+                if blob_hash == index_entry.hexsha:
+                    status = ""
+                else:
+                    # '--ignore-cr-at-eol' doesn't affect '--name-status'
+                    # so we can't really obtain 'T'
+                    status = self.repo.git.diff("--ignore-cr-at-eol", index_entry.hexsha, file_path)
+                    if status:
+                        status = "M"
+                    assert status in {"", "M", "T"}, status
             else:
                 status = ""  # ignore missing paths
 
@@ -1177,7 +1332,12 @@ class GitWrapper:
             return False
 
     def has_commits(self):
-        return self.is_ref("HEAD")
+        # is_ref probes by letting GitPython raise, which is expensive
+        # to do repeatedly. Commits are never removed in this workflow,
+        # so a positive answer can be remembered.
+        if not self._has_commits:
+            self._has_commits = self.is_ref("HEAD")
+        return self._has_commits
 
     def get_tree(self, ref):
         return self.repo.tree(ref)
@@ -1185,21 +1345,64 @@ class GitWrapper:
     def write_tree(self, tree, base_path: str, include_files: Optional[List[str]] = None):
         os.makedirs(base_path, exist_ok=True)
 
-        for obj in tree.traverse(visit_once=True):
-            if include_files and obj.path not in include_files:
-                continue
+        if include_files:
+            include_files = set(include_files)
+
+        # Blobs in one directory share the makedirs call; without the
+        # bookkeeping every object cost a stat per path component
+        created_dirs = {base_path}
+
+        # Object reads have to stay on the calling thread - GitPython's
+        # object database is not thread-safe - but the decompressed
+        # bytes are plain data, so writing them out can overlap with
+        # inflating the next objects. The queue is bounded to cap the
+        # amount of decompressed data held in memory.
+        obj_queue = Queue(maxsize=16)
+        write_errors = []
+
+        def _drain_queue():
+            while True:
+                item = obj_queue.get()
+                if item is None:
+                    break
+                dst_path, data = item
+                try:
+                    with open(dst_path, "wb") as f:
+                        f.write(data)
+                except Exception as e:  # pylint: disable=broad-except
+                    write_errors.append(e)
 
-            path = osp.join(base_path, obj.path)
-            os.makedirs(osp.dirname(path), exist_ok=True)
-            if obj.type == "blob":
-                with open(path, "wb") as f:
-                    obj.stream_data(f)
-            elif obj.type == "tree":
-                pass
-            else:
-                raise ValueError(
-                    "Unexpected object type in a " "git tree: %s (%s)" % (obj.type, obj.hexsha)
-                )
+        writers = [Thread(target=_drain_queue) for _ in range(2)]
+        for writer in writers:
+            writer.start()
+
+        try:
+            for obj in tree.traverse(visit_once=True):
+                if include_files and obj.path not in include_files:
+                    continue
+
+                if obj.type == "blob":
+                    path = osp.join(base_path, obj.path)
+                    dir_path = osp.dirname(path)
+                    if dir_path not in created_dirs:
+                        os.makedirs(dir_path, exist_ok=True)
+                        created_dirs.add(dir_path)
+
+                    obj_queue.put((path, obj.data_stream.read()))
+                elif obj.type == "tree":
+                    pass
+                else:
+                    raise ValueError(
+                        "Unexpected object type in a " "git tree: %s (%s)" % (obj.type, obj.hexsha)
+                    )
+        finally:
+            for _ in writers:
+                obj_queue.put(None)
+            for writer in writers:
+                writer.join()
+
+        if write_errors:
+            raise write_errors[0]
 
     @property
     def head(self) -> str:
@@ -1280,6 +1483,9 @@ class DvcWrapper:
 
     def __init__(self, project_dir):
         self._project_dir = project_dir
+        # obj_path is called on the cache probing hot paths, so the
+        # fixed part of the result is joined once
+        self._cache_root = osp.join(project_dir, ".dvc", "cache") + os.sep
         self.repo = None
 
         if osp.isdir(project_dir) and osp.isdir(self._dvc_dir()):
@@ -1339,27 +1545,51 @@ class DvcWrapper:
                 args.extend(paths)
         self._exec(args)
 
+    _analytics_disabled = False
+    _prompt_patched = False
+    _prompt_answer = None
+
     def _exec(self, args, hide_output=True, answer_on_input="y"):
         args = ["--cd", self._project_dir] + args
 
         # Avoid calling an extra process. Improves call performance and
         # removes an extra console window on Windows.
-        os.environ[self.module().env.DVC_NO_ANALYTICS] = "1"
+        if not DvcWrapper._analytics_disabled:
+            os.environ[self.module().env.DVC_NO_ANALYTICS] = "1"
+            DvcWrapper._analytics_disabled = True
 
-        with ExitStack() as es:
-            es.callback(os.chdir, os.getcwd())  # restore cd after DVC
+        # The prompt is patched once for the process instead of
+        # installing and removing a mock around every call; the
+        # replacement consults the per-call answer and falls back to
+        # the original prompt when none is configured
+        if not DvcWrapper._prompt_patched:
+            import builtins
 
-            if answer_on_input is not None:
+            import dvc.prompt
 
-                def _input(*args):
-                    return answer_on_input
+            # dvc.prompt uses the builtin input() without defining its
+            # own attribute, so read the original the same way
+            original_input = getattr(dvc.prompt, "input", builtins.input)
 
-                es.enter_context(unittest.mock.patch("dvc.prompt.input", new=_input))
+            def _input(*args, **kwargs):
+                answer = DvcWrapper._prompt_answer
+                if answer is None:
+                    return original_input(*args, **kwargs)
+                return answer
 
-            log.debug("Calling DVC main with args: %s", args)
+            dvc.prompt.input = _input
+            DvcWrapper._prompt_patched = True
 
-            logs = es.enter_context(catch_logs("dvc"))
-            retcode = self.module().main.main(args)
+        log.debug("Calling DVC main with args: %s", args)
+
+        prev_dir = os.getcwd()
+        DvcWrapper._prompt_answer = answer_on_input
+        try:
+            with catch_logs("dvc") as logs:
+                retcode = self.module().main.main(args)
+        finally:
+            os.chdir(prev_dir)  # restore cd after DVC
+            DvcWrapper._prompt_answer = None
 
         logs = logs.getvalue()
         if retcode != 0:
@@ -1384,7 +1614,7 @@ class DvcWrapper:
     def obj_path(self, obj_hash, root=None):
         assert self.is_hash(obj_hash), obj_hash
         if not root:
-            root = osp.join(self._project_dir, ".dvc", "cache")
+            return self._cache_root + obj_hash[:2] + os.sep + obj_hash[2:]
         return osp.join(root, obj_hash[:2], obj_hash[2:])
 
     def ignore(
@@ -1401,10 +1631,12 @@ class DvcWrapper:
 
         _update_ignore_file(paths, repo_root=repo_root, mode=mode, filepath=dvcignore)
 
-    # This ruamel parser is needed to preserve comments,
-    # order and form (if multiple forms allowed by the standard)
-    # of the entries in the file. It can be reused.
-    yaml_parser = yaml.YAML(typ="rt")
+    # The parsed files are machine-generated DVC files, and the dumps
+    # only produce temporary files consumed by DVC, so the slow
+    # comment-preserving round-trip mode is not needed. The safe mode
+    # uses the C loader, when available. The parser can be reused.
+    yaml_parser = yaml.YAML(typ="safe")
+    yaml_parser.default_flow_style = False
 
     @classmethod
     def get_hash_from_dvcfile(cls, path) -> str:
@@ -1429,12 +1661,21 @@ class DvcWrapper:
         return cls.is_file_hash(s) or cls.is_dir_hash(s)
 
     def write_obj(self, obj_hash, dst_dir, allow_links=True):
+        # A hardlink is O(1) and avoids moving the object bytes through
+        # the process, so it is always tried first. When the cache and
+        # the destination are on different filesystems or the filesystem
+        # forbids links, the OS refuses, and the data is copied instead.
+
         def _copy_obj(src, dst, link=False):
             os.makedirs(osp.dirname(dst), exist_ok=True)
             if link:
-                os.link(src, dst)
-            else:
-                shutil.copy(src, dst, follow_symlinks=True)
+                try:
+                    os.link(src, dst)
+                    return True
+                except OSError:
+                    pass
+            shutil.copy(src, dst, follow_symlinks=True)
+            return False
 
         src = self.obj_path(obj_hash)
         if osp.isfile(src):
@@ -1447,9 +1688,12 @@ class DvcWrapper:
 
         src_meta = parse_json_file(src)
         for entry in src_meta:
-            _copy_obj(
+            linked = _copy_obj(
                 self.obj_path(entry["md5"]), osp.join(dst_dir, entry["relpath"]), link=allow_links
             )
+            # Don't retry linking for every entry once it has failed -
+            # the reason is a property of the filesystem pair
+            allow_links = allow_links and linked
 
     def remove_cache_obj(self, obj_hash: str):
         src = self.obj_path(obj_hash)
@@ -1704,6 +1948,13 @@ class Project:
         self._aux_dir = found_path
         self._root_dir = osp.dirname(found_path)
 
+        # Fixed bases of the path helpers, precomputed to keep the
+        # frequently called ones a single join
+        self._cache_dir = osp.join(self._aux_dir, ProjectLayout.cache_dir)
+        self._cache_root = self._cache_dir + os.sep
+        self._wtree_dir = osp.join(self._aux_dir, ProjectLayout.working_tree_dir)
+        self._models_dir = osp.join(self._aux_dir, ProjectLayout.models_dir)
+
         self._readonly = readonly
 
         # Force import errors on missing dependencies.
@@ -1719,6 +1970,17 @@ class Project:
         self._working_tree = None
         self._head_tree = None
 
+        # Resolved references. Hashes are immutable, but named refs move
+        # on commit and checkout, which clear this cache.
+        self._ref_cache: Dict[str, Tuple[Project._ObjectIdKind, ObjectId]] = {}
+
+        # Loaded revision trees by commit hash. Revision data is
+        # immutable, so entries never need invalidation.
+        self._rev_trees: Dict[ObjectId, Tree] = {}
+
+        # Source hashes keyed by stat signatures, loaded on demand
+        self._hash_cache: Optional[Dict[str, Dict[str, str]]] = None
+
         local_config = osp.join(self._aux_dir, ProjectLayout.conf_file)
         if osp.isfile(local_config):
             self._config = ProjectConfig.parse(local_config)
@@ -1746,8 +2008,8 @@ class Project:
             self._dvc.init()
             self._dvc.ignore(
                 [
-                    osp.join(self._aux_dir, ProjectLayout.cache_dir),
-                    osp.join(self._aux_dir, ProjectLayout.working_tree_dir),
+                    self._cache_dir,
+                    self._wtree_dir,
                 ]
             )
             self._git.repo.index.remove(
@@ -1871,13 +2133,16 @@ class Project:
             tree_config.base_dir = osp.dirname(config_path)
             tree = Tree(config=tree_config, project=self, rev=obj_hash)
         else:
-            if not self.is_rev_cached(obj_hash):
-                self._materialize_rev(obj_hash)
-
-            rev_dir = self.cache_path(obj_hash)
-            tree_config = TreeConfig.parse(osp.join(rev_dir, TreeLayout.conf_file))
-            tree_config.base_dir = rev_dir
-            tree = Tree(config=tree_config, project=self, rev=obj_hash)
+            tree = self._rev_trees.get(obj_hash)
+            if tree is None:
+                if not self.is_rev_cached(obj_hash):
+                    self._materialize_rev(obj_hash)
+
+                rev_dir = self.cache_path(obj_hash)
+                tree_config = TreeConfig.parse(osp.join(rev_dir, TreeLayout.conf_file))
+                tree_config.base_dir = rev_dir
+                tree = Tree(config=tree_config, project=self, rev=obj_hash)
+                self._rev_trees[obj_hash] = tree
         return tree
 
     def is_rev_cached(self, rev: Revision) -> bool:
@@ -1907,6 +2172,22 @@ class Project:
         if self._is_working_tree_ref(ref):
             return self._ObjectIdKind.tree, ref
 
+        cached = self._ref_cache.get(ref)
+        if cached is not None:
+            return cached
+
+        # A DVC hash can't be a git commit hash (32 vs 40 chars), so
+        # when the DVC cache already holds such an object, there is no
+        # point in a failing git rev-parse round-trip first
+        if (
+            isinstance(ref, str)
+            and self._dvc.is_hash(ref)
+            and (self._dvc.is_cached(ref) or self._is_cached(ref))
+        ):
+            result = self._ObjectIdKind.blob, ref
+            self._ref_cache[ref] = result
+            return result
+
         try:
             obj_type, obj_hash = self._git.rev_parse(ref)
         except Exception:  # nosec - B110:try_except_pass
@@ -1915,11 +2196,15 @@ class Project:
             if obj_type != "commit":
                 raise UnknownRefError(obj_hash)
 
-            return self._ObjectIdKind.tree, obj_hash
+            result = self._ObjectIdKind.tree, obj_hash
+            self._ref_cache[ref] = result
+            return result
 
         try:
             assert self._dvc.is_hash(ref), ref
-            return self._ObjectIdKind.blob, ref
+            result = self._ObjectIdKind.blob, ref
+            self._ref_cache[ref] = result
+            return result
         except Exception as e:
             raise UnknownRefError(ref) from e
 
@@ -1951,7 +2236,7 @@ class Project:
         if self._dvc.is_dir_hash(obj_hash):
             obj_hash = obj_hash[: self._dvc.FILE_HASH_LEN]
 
-        return osp.join(self._aux_dir, ProjectLayout.cache_dir, obj_hash[:2], obj_hash[2:])
+        return self._cache_root + obj_hash[:2] + os.sep + obj_hash[2:]
 
     def _can_retrieve_from_vcs_cache(self, obj_hash: ObjectId):
         if not self._dvc.is_dir_hash(obj_hash):
@@ -1970,7 +2255,7 @@ class Project:
         """
 
         if not root:
-            root = osp.join(self._aux_dir, ProjectLayout.working_tree_dir)
+            root = self._wtree_dir
         return osp.join(root, TreeLayout.sources_dir, name, "source.dvc")
 
     def _make_tmp_dir(self, suffix: Optional[str] = None):
@@ -2035,9 +2320,10 @@ class Project:
 
         log.debug(f"Copying from '{url}' to '{data_dir}'")
 
-        if osp.isdir(url):
+        url_stat = StatCache()
+        if url_stat.isdir(url):
             copytree(url, data_dir)
-        elif osp.isfile(url):
+        elif url_stat.isfile(url):
             os.makedirs(data_dir, exist_ok=True)
             shutil.copy(url, data_dir)
         else:
@@ -2081,10 +2367,61 @@ class Project:
         obj_hash = self._get_source_hash(dvcfile)
         return obj_hash
 
-    def refresh_source_hash(self, source: str, no_cache: bool = True) -> ObjectId:
+    @staticmethod
+    def _source_stat_signature(data_dir: str) -> str:
+        """
+        Computes a signature of the directory from file metadata, without
+        reading the contents. A matching signature identifies unchanged
+        data the same way DVC's own state database does - by path, size
+        and modification time.
+        """
+
+        # The hash is not used in any security context
+        h = hashlib.sha1()  # nosec B324
+        for dirpath, dirnames, filenames in os.walk(data_dir):
+            dirnames.sort()
+            filenames.sort()
+            reldir = osp.relpath(dirpath, data_dir)
+            for filename in filenames:
+                try:
+                    st = os.stat(osp.join(dirpath, filename))
+                except OSError:
+                    continue
+                entry = "%s\0%s\0%s\0%s\0" % (reldir, filename, st.st_size, st.st_mtime_ns)
+                h.update(entry.encode("utf-8"))
+        return h.hexdigest()
+
+    def _load_hash_cache(self) -> Dict[str, Dict[str, str]]:
+        cache = self._hash_cache
+        if cache is None:
+            cache = {}
+            path = osp.join(self._aux_dir, ProjectLayout.hash_cache_file)
+            if osp.isfile(path):
+                # A stale or broken cache only loses the shortcut
+                with suppress(Exception):
+                    cache = parse_json_file(path)
+            self._hash_cache = cache
+        return cache
+
+    def _save_hash_cache(self, cache: Dict[str, Dict[str, str]]):
+        self._hash_cache = cache
+
+        if self.readonly:
+            return
+        with suppress(Exception):
+            dump_json_file(osp.join(self._aux_dir, ProjectLayout.hash_cache_file), cache)
+
+    def refresh_source_hash(
+        self, source: str, no_cache: bool = True, known_hash: Optional[ObjectId] = None
+    ) -> ObjectId:
         """
         Computes and updates the source hash in the working directory.
 
+        'known_hash' is a freshly computed hash of the source data, e.g.
+        from a preceding status check. When it matches the recorded
+        source dvcfile, the data is unchanged and the expensive DVC
+        re-hashing can be skipped.
+
         Returns: hash
         """
 
@@ -2099,7 +2436,14 @@ class Project:
 
         dvcfile = self._source_dvcfile_path(source)
         os.makedirs(osp.dirname(dvcfile), exist_ok=True)
-        obj_hash = self.compute_source_hash(source_dir, dvcfile=dvcfile, no_cache=no_cache)
+
+        obj_hash = None
+        if no_cache and known_hash is not None and osp.isfile(dvcfile):
+            with suppress(Exception):
+                if self._get_source_hash(dvcfile) == known_hash:
+                    obj_hash = known_hash
+        if obj_hash is None:
+            obj_hash = self.compute_source_hash(source_dir, dvcfile=dvcfile, no_cache=no_cache)
 
         build_target.head.hash = obj_hash
         if not build_target.has_stages:
@@ -2179,8 +2523,12 @@ class Project:
             os.rmdir(data_dir)
 
         if url:
+            # The same paths are checked several ways below, so share
+            # the stat results between the checks
+            stat_cache = StatCache()
+
             url = osp.abspath(url)
-            if not osp.exists(url):
+            if not stat_cache.exists(url):
                 raise FileNotFoundError(url)
 
             if is_subpath(url, base=self._root_dir):
@@ -2189,7 +2537,7 @@ class Project:
             if rpath:
                 rpath = osp.normpath(osp.join(url, rpath))
 
-                if not osp.exists(rpath):
+                if not stat_cache.exists(rpath):
                     raise FileNotFoundError(rpath)
 
                 if not is_subpath(rpath, base=url):
@@ -2199,7 +2547,7 @@ class Project:
                     )
 
                 rpath = osp.relpath(rpath, url)
-            elif osp.isfile(url):
+            elif stat_cache.isfile(url):
                 rpath = osp.basename(url)
         else:
             rpath = None
@@ -2225,7 +2573,13 @@ class Project:
                     url, tmp_dir, no_cache=no_cache, no_hash=no_hash
                 )
 
-                shutil.move(tmp_data_dir, data_dir)
+                # The tmp dir lives inside the project, so a single
+                # rename normally suffices. Fall back to a copying move
+                # for exotic setups with the tmp dir on another device.
+                try:
+                    os.replace(tmp_data_dir, data_dir)
+                except OSError:
+                    shutil.move(tmp_data_dir, data_dir)
                 on_error_do(rmtree, data_dir)
 
                 if not no_hash:
@@ -2339,18 +2693,23 @@ class Project:
 
         self.working_tree.sources.remove(name)
 
+        # Remove without the existence pre-checks - a missing path is
+        # reported by the removal itself, saving a stat syscall each
         data_dir = self.source_data_dir(name)
         if not keep_data:
-            if osp.isdir(data_dir):
+            try:
                 rmtree(data_dir)
+            except (FileNotFoundError, NotADirectoryError):
+                pass
 
         dvcfile = self._source_dvcfile_path(name)
-        if osp.isfile(dvcfile):
-            try:
-                rmfile(dvcfile)
-            except Exception:
-                if not force:
-                    raise
+        try:
+            rmfile(dvcfile)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            if not force:
+                raise
 
         self.working_tree.build_targets.remove_target(name)
 
@@ -2383,7 +2742,7 @@ class Project:
         if self.readonly:
             raise ReadonlyProjectError()
 
-        statuses = self.status()
+        statuses, wd_hashes = self._compute_status()
 
         if not allow_empty and not statuses:
             raise EmptyCommitError()
@@ -2406,9 +2765,9 @@ class Project:
                     )
 
         for s in self.working_tree.sources:
-            self.refresh_source_hash(s, no_cache=no_cache)
+            self.refresh_source_hash(s, no_cache=no_cache, known_hash=wd_hashes.get(s))
 
-        wtree_dir = osp.join(self._aux_dir, ProjectLayout.working_tree_dir)
+        wtree_dir = self._wtree_dir
         self.working_tree.save()
         self._git.add(wtree_dir, base=wtree_dir)
 
@@ -2422,6 +2781,7 @@ class Project:
         self._git.add(extra_files, base=self._root_dir)
 
         head = self._git.commit(message)
+        self._ref_cache.clear()  # named refs have moved
 
         rev_dir = self.cache_path(head)
         copytree(wtree_dir, rev_dir)
@@ -2478,10 +2838,10 @@ class Project:
         if sources:
             rev_tree = self.get_rev(rev)
 
-            # Check targets
-            for s in sources:
-                if not s in rev_tree.sources:
-                    raise UnknownSourceError(s)
+            # Check targets with a single pass over the source list
+            unknown_sources = sources - set(rev_tree.sources)
+            if unknown_sources:
+                raise UnknownSourceError(next(iter(unknown_sources)))
 
             rev_dir = rev_tree.config.base_dir
             with self._make_tmp_dir() as tmp_dir:
@@ -2514,8 +2874,9 @@ class Project:
             # Check working tree for unsaved changes,
             # set HEAD to the revision
             # write revision tree to working tree
-            wtree_dir = osp.join(self._aux_dir, ProjectLayout.working_tree_dir)
+            wtree_dir = self._wtree_dir
             self._git.checkout(rev, dst_dir=wtree_dir, clean=True, force=force)
+            self._ref_cache.clear()  # HEAD has moved
             self._move_dvc_dir(osp.join(wtree_dir, ".dvc"), osp.join(self._root_dir, ".dvc"))
 
             self._working_tree = None
@@ -2552,32 +2913,73 @@ class Project:
     def is_ref(self, ref: Union[None, str]) -> bool:
         if self._is_working_tree_ref(ref):
             return True
+        # A previously resolved ref is known valid without re-probing
+        # git, which answers misses by raising
+        if ref in self._ref_cache:
+            return True
         return self._git.is_ref(ref)
 
     def has_commits(self) -> bool:
         return self._git.has_commits()
 
     def status(self) -> Dict[str, DiffStatus]:
+        statuses, _ = self._compute_status()
+        return statuses
+
+    def _compute_status(self) -> Tuple[Dict[str, DiffStatus], Dict[str, ObjectId]]:
+        """
+        Compares the working tree and the last commit.
+
+        Returns: (statuses, working dir hashes computed on the way)
+        """
+
         wd = self.working_tree
+        wd_hashes = {}
 
         if not self.has_commits():
-            return {s: DiffStatus.added for s in wd.sources}
+            return {s: DiffStatus.added for s in wd.sources}, wd_hashes
 
         head = self.head
 
         changed_targets = {}
 
+        # Source data dirs are siblings in the project root, so one
+        # directory scan replaces an isdir check per target
+        root_entries = dir_entries(self._root_dir)
+
+        hash_cache = self._load_hash_cache()
+        new_hash_cache = {}
+
         for t_name, wd_target in wd.build_targets.items():
             if t_name == ProjectBuildTargets.MAIN_TARGET:
                 continue
 
-            if osp.isdir(self.source_data_dir(t_name)):
+            t_entry = root_entries.get(t_name)
+            if t_entry is not None and t_entry.is_dir():
                 old_hash = wd_target.head.hash
-                new_hash = self.compute_source_hash(t_name, no_cache=True)
+
+                # Hashing source contents dominates the status check.
+                # When the file metadata is unchanged since the hash
+                # was last computed, reuse it instead of re-reading
+                # the data.
+                stat_sig = self._source_stat_signature(self.source_data_dir(t_name))
+                cached = hash_cache.get(t_name)
+                new_hash = None
+                # A hand-edited or truncated cache entry must not be
+                # trusted beyond its expected shape
+                if isinstance(cached, dict) and cached.get("stat_sig") == stat_sig:
+                    new_hash = cached.get("hash")
+                if not new_hash:
+                    new_hash = self.compute_source_hash(t_name, no_cache=True)
+                new_hash_cache[t_name] = {"stat_sig": stat_sig, "hash": new_hash}
+                wd_hashes[t_name] = new_hash
 
                 if old_hash and old_hash != new_hash:
                     changed_targets[t_name] = DiffStatus.foreign_modified
 
+        # Entries of removed sources are dropped on the way
+        self._save_hash_cache(new_hash_cache)
+
         for t_name in set(head.build_targets) | set(wd.build_targets):
             if t_name == ProjectBuildTargets.MAIN_TARGET:
                 continue
@@ -2602,7 +3004,7 @@ class Project:
             if status:
                 changed_targets[t_name] = status
 
-        return changed_targets
+        return changed_targets, wd_hashes
 
     def history(self, max_count=10) -> List[Tuple[Revision, str]]:
         return [(c.hexsha, c.message) for c, _ in self._git.log(max_count)]
@@ -2654,7 +3056,7 @@ class Project:
         return changed_targets
 
     def model_data_dir(self, name: str) -> str:
-        return osp.join(self._aux_dir, ProjectLayout.models_dir, name)
+        return osp.join(self._models_dir, name)
 
     def make_model(self, name: str) -> Launcher:
         model = self._config.models[name]
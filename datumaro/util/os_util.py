@@ -11,48 +11,143 @@ import subprocess  # nosec B404
 import sys
 import unicodedata
 from contextlib import ExitStack, contextmanager, redirect_stderr, redirect_stdout
+from functools import lru_cache
 from io import StringIO
-from typing import Iterable, Iterator, Optional, Union
+from stat import S_ISDIR, S_ISREG
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional, Union
 
-try:
+_rm_impl = None
+
+
+def _resolve_rm_impl():
     # Declare functions to remove files and directories.
     #
     # Use rmtree from GitPython to avoid the problem with removal of
     # readonly files on Windows, which Git uses extensively
     # It double checks if a file cannot be removed because of readonly flag
-    from git.util import rmfile, rmtree  # pylint: disable=unused-import
-except ModuleNotFoundError:
-    from os import remove as rmfile  # pylint: disable=unused-import
-    from shutil import rmtree as rmtree  # pylint: disable=unused-import
+    #
+    # The import is resolved on first use - GitPython is a heavy
+    # optional dependency, which shouldn't be pulled in just by
+    # importing this module.
+    global _rm_impl
+    if _rm_impl is None:
+        try:
+            from git.util import rmfile, rmtree
+        except ModuleNotFoundError:
+            from os import remove as rmfile
+            from shutil import rmtree
+        _rm_impl = (rmfile, rmtree)
+    return _rm_impl
+
+
+def rmfile(path):
+    return _resolve_rm_impl()[0](path)
+
+
+def rmtree(path, *args, **kwargs):
+    return _resolve_rm_impl()[1](path, *args, **kwargs)
+
 
 from . import cast
 
 DEFAULT_MAX_DEPTH = 10
 
 
+class StatCache:
+    """
+    Memoizes os.stat() results for the duration of an operation.
+    Allows to avoid repeated exists/isfile/isdir syscalls on the
+    same paths in metadata-heavy code.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Optional[os.stat_result]] = {}
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        try:
+            result = self._stats[path]
+        except KeyError:
+            try:
+                result = os.stat(path)
+            except OSError:
+                result = None
+            self._stats[path] = result
+        return result
+
+    def exists(self, path: str) -> bool:
+        return self.stat(path) is not None
+
+    def isfile(self, path: str) -> bool:
+        result = self.stat(path)
+        return result is not None and S_ISREG(result.st_mode)
+
+    def isdir(self, path: str) -> bool:
+        result = self.stat(path)
+        return result is not None and S_ISDIR(result.st_mode)
+
+
+def dir_entries(path: str) -> Dict[str, os.DirEntry]:
+    """
+    Returns a mapping of entry names to DirEntry objects for a directory.
+    DirEntry.is_dir()/is_file() reuse the file type reported by the OS
+    during listing, so bulk existence checks over the entries avoid an
+    extra stat() per path. A missing directory yields an empty mapping.
+    """
+
+    try:
+        with os.scandir(path) as entries:
+            return {e.name: e for e in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+
+@lru_cache(maxsize=1)
+def _cpu_flags() -> FrozenSet[str]:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                # x86 exposes "flags", ARM exposes "Features"
+                if line.startswith(("flags", "Features")):
+                    return frozenset(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+
+    # Ignore warnings from bandit about the subprocess call.
+    # In this case we control what is called and command arguments
+    # PATH overriding is considered low risk
+    try:
+        output = subprocess.check_output(["lscpu"]).decode("utf-8")  # nosec B603, B607
+    except (OSError, subprocess.CalledProcessError):
+        return frozenset()
+
+    for line in output.splitlines():
+        if line.lstrip().startswith("Flags"):
+            return frozenset(line.split(":", 1)[1].split())
+    return frozenset()
+
+
 def check_instruction_set(instruction):
-    return instruction == str.strip(
-        # Let's ignore a warning from bandit about using shell=True.
-        # In this case it isn't a security issue and we use some
-        # shell features like pipes.
-        subprocess.check_output(  # nosec B602
-            'lscpu | grep -o "%s" | head -1' % instruction, shell=True
-        ).decode("utf-8")
-    )
+    # A set lookup over the flags read once, instead of a shell
+    # pipeline spawned per query
+    return instruction.lower() in _cpu_flags()
 
 
 def import_foreign_module(name, path):
-    module = None
-    default_path = sys.path.copy()
+    # A single insert/remove pair instead of copying and replacing
+    # the whole sys.path around the import
+    path = osp.abspath(path)
+    sys.path.insert(0, path)
     try:
-        sys.path = [
-            osp.abspath(path),
-        ] + default_path
         sys.modules.pop(name, None)  # remove from cache
         module = importlib.import_module(name)
-        sys.modules.pop(name)  # remove from cache
+        # Keep the foreign module out of the cache, so it can't
+        # shadow a regular module with the same name later
+        sys.modules.pop(name)
     finally:
-        sys.path = default_path
+        try:
+            sys.path.remove(path)
+        except ValueError:
+            pass
     return module
 
 
@@ -60,14 +155,50 @@ def walk(path, max_depth=None):
     if max_depth is None:
         max_depth = DEFAULT_MAX_DEPTH
 
-    baselevel = path.count(osp.sep)
-    for dirpath, dirnames, filenames in os.walk(path, topdown=True):
-        curlevel = dirpath.count(osp.sep)
-        if baselevel + max_depth <= curlevel:
-            dirnames.clear()  # topdown=True allows to modify the list
+    # A scandir-based traversal instead of os.walk: the depth is a
+    # plain counter instead of counting path separators, and the file
+    # type reported during listing spares a stat per entry. Like with
+    # os.walk(topdown=True), the yielded directory list can be
+    # modified to prune the traversal.
+    stack = [(path, 0)]
+    while stack:
+        dirpath, depth = stack.pop()
+
+        dir_entry_map = {}
+        filenames = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dir_entry_map[entry.name] = entry
+                    else:
+                        filenames.append(entry.name)
+        except OSError:
+            continue
+
+        dirnames = list(dir_entry_map)
+        if max_depth <= depth:
+            dirnames.clear()
 
         yield dirpath, dirnames, filenames
 
+        for name in reversed(dirnames):
+            entry = dir_entry_map.get(name)
+            if entry is not None:
+                # symlinked directories are reported, but not entered,
+                # as os.walk does by default
+                if not entry.is_symlink():
+                    stack.append((entry.path, depth + 1))
+            else:
+                # the name was added by the caller
+                new_path = osp.join(dirpath, name)
+                if osp.isdir(new_path) and not osp.islink(new_path):
+                    stack.append((new_path, depth + 1))
+
 
 def find_files(
     dirpath: str, exts: Union[str, Iterable[str]], recursive: bool = False, max_depth: int = None
@@ -119,7 +250,7 @@ def copytree(src, dst):
         os.makedirs(dst_basedir, exist_ok=True)
 
     try:
-        if sys.platform == "windows":
+        if sys.platform == "win32":
             # Ignore
             #   B603: subprocess_without_shell_equals_true
             #   B607: start_process_with_partial_path
@@ -167,31 +298,38 @@ def catch_output():
 
 
 def dir_items(path, ext, truncate_ext=False):
-    items = []
-    for f in os.listdir(path):
-        ext_pos = f.rfind(ext)
-        if ext_pos != -1:
-            if truncate_ext:
-                f = f[:ext_pos]
-            items.append(f)
-    return items
+    # endswith is a tail comparison instead of the full reverse scan
+    # rfind did; it also only matches actual extensions, rather than
+    # the extension string anywhere in the name
+    cut = -len(ext) if truncate_ext and ext else None
+    with os.scandir(path) as entries:
+        return [e.name[:cut] for e in entries if e.name.endswith(ext)]
 
 
-def split_path(path):
+@lru_cache(maxsize=1024)
+def _split_path(path: str) -> tuple:
     path = osp.normpath(path)
-    parts = []
+    drive, rest = osp.splitdrive(path)
+    if osp.altsep:
+        rest = rest.replace(osp.altsep, osp.sep)
 
-    while True:
-        path, part = osp.split(path)
-        if part:
-            parts.append(part)
-        else:
-            if path:
-                parts.append(path)
-            break
-    parts.reverse()
+    parts = [part for part in rest.split(osp.sep) if part]
+
+    # keep the root (and the drive, when there is one) as the first
+    # part, the way the osp.split loop did
+    root = rest[: len(rest) - len(rest.lstrip(osp.sep))]
+    anchor = drive + root
+    if anchor:
+        parts.insert(0, anchor)
+    return tuple(parts)
 
-    return parts
+
+def split_path(path):
+    # A single linear split instead of an osp.split loop, which scans
+    # the remaining path once per component. The same roots are split
+    # over and over, so the result is cached; a copy is returned to
+    # keep the cached value immutable.
+    return list(_split_path(path))
 
 
 def is_subpath(path: str, base: str) -> bool:
@@ -204,20 +342,33 @@ def is_subpath(path: str, base: str) -> bool:
     return osp.join(path, "").startswith(osp.join(base, ""))
 
 
+_NON_WORD_RE = re.compile(r"[^\w\s-]")
+_DASH_RE = re.compile(r"[-\s]+")
+
+
+@lru_cache(maxsize=4096)
 def make_file_name(s: str) -> str:
     # adapted from
     # https://docs.djangoproject.com/en/2.1/_modules/django/utils/text/#slugify
     """
     Normalizes string, converts to lowercase, removes non-alpha characters,
     and converts spaces to hyphens.
+
+    The result is cached - the same label and subset names recur for
+    every item on dataset export paths.
     """
     s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore")
     s = s.decode()
-    s = re.sub(r"[^\w\s-]", "", s).strip().lower()
-    s = re.sub(r"[-\s]+", "-", s)
+    s = _NON_WORD_RE.sub("", s).strip().lower()
+    s = _DASH_RE.sub("-", s)
     return s
 
 
+@lru_cache(maxsize=256)
+def _make_next_name_pattern(basename: str, sep: str, suffix: str) -> "re.Pattern":
+    return re.compile(r"%s(?:%s(\d+))?%s" % tuple(map(re.escape, [basename, sep, suffix])))
+
+
 def generate_next_name(
     names: Iterable[str],
     basename: str,
@@ -247,10 +398,10 @@ def generate_next_name(
     Output: name_base6
     """
 
-    pattern = re.compile(r"%s(?:%s(\d+))?%s" % tuple(map(re.escape, [basename, sep, suffix])))
-    matches = [match for match in (pattern.match(n) for n in names) if match]
+    pattern = _make_next_name_pattern(basename, sep, suffix)
+    matches = (match for match in (pattern.match(n) for n in names) if match)
 
-    max_idx = max([cast(match[1], int, 0) for match in matches], default=None)
+    max_idx = max((cast(match[1], int, 0) for match in matches), default=None)
     if max_idx is None:
         if default is not None:
             idx = sep + str(default)
@@ -4,10 +4,12 @@
 #
 # SPDX-License-Identifier: MIT
 
+import os
 import shutil
 import subprocess
 import tarfile
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import git
@@ -52,13 +54,15 @@ def git_checkout(tagname, repo, temp_dir):
     for subdir in subdirs:
         shutil.rmtree(temp_dir / subdir)
 
-        with tempfile.TemporaryFile() as archive:
-            # `git checkout` doesn't work for this, as it modifies the index.
-            # `git restore` would work, but it's only available since Git 2.23.
-            repo.git.archive(tagname, "--", subdir, output_stream=archive)
-            archive.seek(0)
-            with tarfile.open(fileobj=archive) as tar:
-                tar.extractall(temp_dir)
+    # A single git invocation for all the subdirs - every call forks
+    # a git process, which is the bulk of the cost here.
+    with tempfile.TemporaryFile() as archive:
+        # `git checkout` doesn't work for this, as it modifies the index.
+        # `git restore` would work, but it's only available since Git 2.23.
+        repo.git.archive(tagname, "--", *subdirs, output_stream=archive)
+        archive.seek(0)
+        with tarfile.open(fileobj=archive) as tar:
+            tar.extractall(temp_dir)
 
 
 def change_version_menu_toml(filename, version):
@@ -76,7 +80,7 @@ def generate_docs(repo, output_dir, tags):
         content_loc = Path(temp_dir, "site")
         shutil.copytree(repo_root / "site", content_loc, symlinks=True)
 
-        def run_hugo(destination_dir):
+        def run_hugo(content_dir, destination_dir):
             subprocess.run(  # nosec B603, B607
                 [
                     "hugo",
@@ -85,7 +89,7 @@ def generate_docs(repo, output_dir, tags):
                     "--config",
                     "config.toml,versioning.toml",
                 ],
-                cwd=content_loc,
+                cwd=content_dir,
                 check=True,
             )
 
@@ -93,13 +97,38 @@ def generate_docs(repo, output_dir, tags):
 
         generate_versioning_config(versioning_toml_path, (t.name for t in tags))
         change_version_menu_toml(versioning_toml_path, "develop")
-        run_hugo(output_dir)
-
-        generate_versioning_config(versioning_toml_path, (t.name for t in tags), "/..")
+        run_hugo(content_loc, output_dir)
+
+        # The tag builds are independent, but the old in-place scheme
+        # serialized them by reusing one site tree. Prepare a tree per
+        # tag sequentially (git archive extraction and the config
+        # rewrites mutate it), then run the hugo builds - the
+        # expensive part - in parallel.
+        tag_builds = []
         for tag in tags:
-            git_checkout(tag.name, repo, Path(temp_dir))
-            change_version_menu_toml(versioning_toml_path, tag.name)
-            run_hugo(output_dir / tag.name)
+            tag_root = Path(temp_dir, "tags", tag.name)
+            tag_loc = tag_root / "site"
+            # The trees live on the same filesystem, and hugo only
+            # reads them, so hardlinks replace byte-for-byte copies
+            # of the content and image files
+            shutil.copytree(content_loc, tag_loc, symlinks=True, copy_function=os.link)
+
+            # versioning.toml is rewritten per tag; break its link so
+            # the truncating write cannot reach the other trees
+            versioning_copy = tag_loc / "versioning.toml"
+            if versioning_copy.exists():
+                versioning_copy.unlink()
+
+            git_checkout(tag.name, repo, tag_root)
+            generate_versioning_config(tag_loc / "versioning.toml", (t.name for t in tags), "/..")
+            change_version_menu_toml(tag_loc / "versioning.toml", tag.name)
+            tag_builds.append((tag_loc, output_dir / tag.name))
+
+        if tag_builds:
+            max_workers = min(len(tag_builds), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for future in [executor.submit(run_hugo, loc, dst) for loc, dst in tag_builds]:
+                    future.result()
 
 
 if __name__ == "__main__":
@@ -101,18 +101,22 @@ nitpick_ignore_regex = [
 ]
 
 # Members to be included.
-include_members_list = [
-    "__init__",
-    "__iter__",
-    "__eq__",
-    "__len__",
-    "__contains__",
-    "__getitem__",
-]
+include_members_list = frozenset(
+    [
+        "__init__",
+        "__iter__",
+        "__eq__",
+        "__len__",
+        "__contains__",
+        "__getitem__",
+    ]
+)
+
+_CAMEL_CASE_RE = re.compile(r"([A-Z])")
 
 
 def skip_member(app, what, name, obj, skip, options):
-    if all(name != a for a in include_members_list):
+    if name not in include_members_list:
         return name.startswith("_")
 
 
@@ -125,7 +129,7 @@ def replace(app, what, name, obj, options, lines):
         "importer",
         "validator",
     ]
-    names = re.sub(r"([A-Z])", r" \1", name.replace("_", "").split(".")[-1]).split()
+    names = _CAMEL_CASE_RE.sub(r" \1", name.replace("_", "").split(".")[-1]).split()
     for n, a in enumerate(names):
         if len(a) != 1:
             for b in exclude_plugins_name:
@@ -135,14 +139,18 @@ def replace(app, what, name, obj, options, lines):
         prog_name = "".join(names).lower()
     else:
         prog_name = "_".join(names).lower()
+    prog = "%(prog)s"
     for i, line in enumerate(lines):
-        if line:
-            prog = str("%(prog)s")
-            lines[i] = lines[i].replace(prog, prog_name)
-            lines[i] = lines[i].replace("'frame_'", r"'frame\_'")  # fix unwanted link
-            if not "'|n'" in lines[i]:
-                if not "'|s'" in lines[i]:
-                    lines[i] = lines[i].replace("|n", "\n").replace("|s", " ")
+        if not line:
+            continue
+        # probe before replacing, so untouched lines aren't reallocated
+        if prog in line:
+            line = line.replace(prog, prog_name)
+        if "'frame_'" in line:
+            line = line.replace("'frame_'", r"'frame\_'")  # fix unwanted link
+        if "|" in line and "'|n'" not in line and "'|s'" not in line:
+            line = line.replace("|n", "\n").replace("|s", " ")
+        lines[i] = line
 
 
 def setup(app):
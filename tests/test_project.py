@@ -2,12 +2,12 @@ import os
 import os.path as osp
 import shutil
 import textwrap
-from unittest import TestCase
+from unittest import TestCase, mock
 
 import numpy as np
 
 from datumaro.components.annotation import Bbox, Label
-from datumaro.components.config_model import Model, Source
+from datumaro.components.config_model import Model, ProjectLayout, Source
 from datumaro.components.dataset import DEFAULT_FORMAT, Dataset
 from datumaro.components.errors import (
     DatasetMergeError,
@@ -46,6 +46,18 @@ class ProjectTest(TestCase):
 
         self.assertTrue(".datumaro" in os.listdir(test_dir))
 
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    @scoped
+    def test_can_call_dvc_command(self):
+        test_dir = scope_add(TestDir())
+        project = scope_add(Project.init(test_dir))
+
+        # exercises the real DVC entrypoint, including the
+        # prompt patch installed by _exec
+        logs = project._dvc._exec(["status"])
+
+        self.assertIsInstance(logs, str)
+
     @mark_requirement(Requirements.DATUM_GENERAL_REQ)
     @scoped
     def test_can_find_project_in_project_dir(self):
@@ -1045,6 +1057,120 @@ class ProjectTest(TestCase):
             status,
         )
 
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    @scoped
+    def test_status_reuses_hash_of_unchanged_source(self):
+        test_dir = scope_add(TestDir())
+        source_url = osp.join(test_dir, "test_repo")
+        dataset = Dataset.from_iterable(
+            [
+                DatasetItem(1, annotations=[Label(0)]),
+            ],
+            categories=["a"],
+        )
+        dataset.save(source_url)
+
+        project = scope_add(Project.init(osp.join(test_dir, "proj")))
+        project.import_source("s1", url=source_url, format=DEFAULT_FORMAT)
+        project.commit("Commit 1")
+
+        project.status()  # fills the hash cache
+
+        with mock.patch.object(project, "compute_source_hash") as compute_mock:
+            status = project.status()
+
+        compute_mock.assert_not_called()
+        self.assertEqual({}, status)
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    @scoped
+    def test_status_detects_changes_despite_hash_cache(self):
+        test_dir = scope_add(TestDir())
+        source_url = osp.join(test_dir, "test_repo")
+        dataset = Dataset.from_iterable(
+            [
+                DatasetItem(1, annotations=[Label(0)]),
+            ],
+            categories=["a"],
+        )
+        dataset.save(source_url)
+
+        project = scope_add(Project.init(osp.join(test_dir, "proj")))
+        project.import_source("s1", url=source_url, format=DEFAULT_FORMAT)
+        project.commit("Commit 1")
+
+        project.status()  # fills the hash cache
+
+        # modify an existing file in place - the signature must
+        # invalidate the cached hash
+        ann_dir = osp.join(project.source_data_dir("s1"), "annotations")
+        ann_path = osp.join(ann_dir, os.listdir(ann_dir)[0])
+        with open(ann_path, "a") as f:
+            f.write(" ")
+
+        status = project.status()
+        self.assertEqual({"s1": DiffStatus.foreign_modified}, status)
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    @scoped
+    def test_status_survives_broken_hash_cache(self):
+        test_dir = scope_add(TestDir())
+        source_url = osp.join(test_dir, "test_repo")
+        dataset = Dataset.from_iterable(
+            [
+                DatasetItem(1, annotations=[Label(0)]),
+            ],
+            categories=["a"],
+        )
+        dataset.save(source_url)
+
+        proj_dir = osp.join(test_dir, "proj")
+        project = scope_add(Project.init(proj_dir))
+        project.import_source("s1", url=source_url, format=DEFAULT_FORMAT)
+        project.commit("Commit 1")
+        project.close()
+
+        cache_path = osp.join(proj_dir, ProjectLayout.aux_dir, ProjectLayout.hash_cache_file)
+
+        with open(cache_path, "w") as f:
+            f.write("garbage")
+        project = scope_add(Project(proj_dir))
+        self.assertEqual({}, project.status())
+        project.close()
+
+        # a hand-edited entry of an unexpected shape is ignored too
+        with open(cache_path, "w") as f:
+            f.write('{"s1": []}')
+        project = scope_add(Project(proj_dir))
+        self.assertEqual({}, project.status())
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    @scoped
+    def test_status_of_readonly_project_does_not_write_hash_cache(self):
+        test_dir = scope_add(TestDir())
+        source_url = osp.join(test_dir, "test_repo")
+        dataset = Dataset.from_iterable(
+            [
+                DatasetItem(1, annotations=[Label(0)]),
+            ],
+            categories=["a"],
+        )
+        dataset.save(source_url)
+
+        proj_dir = osp.join(test_dir, "proj")
+        project = scope_add(Project.init(proj_dir))
+        project.import_source("s1", url=source_url, format=DEFAULT_FORMAT)
+        project.commit("Commit 1")
+        project.close()
+
+        cache_path = osp.join(proj_dir, ProjectLayout.aux_dir, ProjectLayout.hash_cache_file)
+        if osp.isfile(cache_path):
+            os.remove(cache_path)
+
+        project = scope_add(Project(proj_dir, readonly=True))
+        self.assertEqual({}, project.status())
+        self.assertFalse(osp.isfile(cache_path))
+
     @mark_requirement(Requirements.DATUM_GENERAL_REQ)
     @scoped
     def test_can_compare_revisions(self):
@@ -4,6 +4,7 @@ from contextlib import suppress
 from unittest import TestCase, mock
 
 from datumaro.util import is_method_redefined
+from datumaro.util.digraph import DiGraph
 from datumaro.util.os_util import walk
 from datumaro.util.scope import Scope, on_error_do, on_exit_do, scoped
 from datumaro.util.test_utils import TestDir
@@ -201,3 +202,143 @@ class TestMemberRedefined(TestCase):
         obj = self.Base()
         with mock.patch.object(obj, "method"):
             self.assertTrue(is_method_redefined("method", self.Base, obj))
+
+
+class DiGraphTest(TestCase):
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_can_add_nodes_with_attrs(self):
+        g = DiGraph()
+
+        g.add_node("a", x=1)
+        g.add_node("b")
+
+        self.assertEqual(2, len(g))
+        self.assertTrue("a" in g)
+        self.assertEqual({"x": 1}, g.nodes["a"])
+        self.assertEqual({}, g.nodes["b"])
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_add_node_updates_attrs_of_existing_node(self):
+        g = DiGraph()
+
+        g.add_edge("a", "b")
+        g.add_node("a", x=1)
+        g.add_node("a", y=2)
+
+        self.assertEqual({"x": 1, "y": 2}, g.nodes["a"])
+        self.assertEqual(["b"], list(g.successors("a")))
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_add_edge_creates_missing_nodes(self):
+        g = DiGraph()
+
+        g.add_edge("a", "b")
+
+        self.assertEqual({"a", "b"}, set(g))
+        self.assertEqual(["b"], list(g.successors("a")))
+        self.assertEqual(["a"], list(g.predecessors("b")))
+        self.assertEqual(0, g.in_degree("a"))
+        self.assertEqual(1, g.out_degree("a"))
+        self.assertEqual(1, g.in_degree("b"))
+        self.assertEqual(0, g.out_degree("b"))
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_can_remove_edge(self):
+        g = DiGraph()
+        g.add_edge("a", "b")
+        g.add_edge("a", "c")
+
+        g.remove_edge("a", "b")
+
+        self.assertEqual(["c"], list(g.successors("a")))
+        self.assertEqual([], list(g.predecessors("b")))
+        self.assertTrue("b" in g)
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_remove_node_removes_incident_edges(self):
+        g = DiGraph()
+        g.add_edge("a", "b")
+        g.add_edge("b", "c")
+
+        g.remove_node("b")
+
+        self.assertEqual({"a", "c"}, set(g))
+        self.assertEqual([], list(g.successors("a")))
+        self.assertEqual([], list(g.predecessors("c")))
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_subgraph_keeps_only_requested_nodes_and_edges(self):
+        g = DiGraph()
+        g.add_edge("a", "b")
+        g.add_edge("b", "c")
+        g.add_node("a", x=1)
+
+        sub = g.subgraph(["a", "b"])
+
+        self.assertEqual({"a", "b"}, set(sub))
+        self.assertEqual(["b"], list(sub.successors("a")))
+        self.assertEqual([], list(sub.successors("b")))
+        self.assertEqual({"x": 1}, sub.nodes["a"])
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_subgraph_is_independent_of_the_original(self):
+        g = DiGraph()
+        g.add_edge("a", "b")
+        g.add_node("a", x=1)
+
+        sub = g.subgraph(["a", "b"])
+        sub.add_node("a", x=2)
+        sub.remove_edge("a", "b")
+        sub.add_node("c")
+
+        self.assertEqual({"x": 1}, g.nodes["a"])
+        self.assertEqual(["b"], list(g.successors("a")))
+        self.assertFalse("c" in g)
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_can_copy(self):
+        g = DiGraph()
+        g.add_edge("a", "b")
+        g.add_node("b", x=1)
+
+        c = g.copy()
+        c.remove_node("a")
+
+        self.assertEqual({"b"}, set(c))
+        self.assertEqual({"a", "b"}, set(g))
+        self.assertEqual({"x": 1}, c.nodes["b"])
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_can_sort_topologically(self):
+        g = DiGraph()
+        g.add_edge("a", "b")
+        g.add_edge("b", "c")
+        g.add_edge("a", "c")
+        g.add_node("d")
+
+        order = list(g.topological_sort())
+
+        self.assertEqual({"a", "b", "c", "d"}, set(order))
+        self.assertLess(order.index("a"), order.index("b"))
+        self.assertLess(order.index("b"), order.index("c"))
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_topological_sort_reports_cycles(self):
+        g = DiGraph()
+        g.add_edge("a", "b")
+        g.add_edge("b", "a")
+
+        with self.assertRaises(ValueError):
+            list(g.topological_sort())
+
+    @mark_requirement(Requirements.DATUM_GENERAL_REQ)
+    def test_version_counts_modifications(self):
+        g = DiGraph()
+
+        v0 = g.version
+        g.add_node("a")
+        g.add_edge("a", "b")
+        g.remove_edge("a", "b")
+        g.remove_node("a")
+
+        self.assertEqual(v0 + 4, g.version)